@@ -2,7 +2,7 @@
 -- DuckDB Schema Definition for Checkout Flow Optimization
 -- =====================================================================
 -- Purpose: Register external views over Parquet-partitioned event data
--- Location: data/raw/<event>/date=*/part-*.parquet
+-- Location: data/raw/events/date=*/part-*.parquet
 -- Database: duckdb/warehouse.duckdb
 -- =====================================================================
 
@@ -18,7 +18,10 @@ CREATE SCHEMA IF NOT EXISTS events;
 -- =====================================================================
 -- Event Views: Register Parquet partitions as queryable views
 -- =====================================================================
--- Pattern: data/raw/<event>/date=*/part-*.parquet
+-- Pattern: data/raw/events/date=*/part-*.parquet
+-- All event types share one tall table with an event_type column; each
+-- view selects its event type's columns. Row groups hold a single event
+-- type, so the event_type filter skips the other types' row groups.
 -- Views are created with OR REPLACE to allow re-running this script
 -- Note: Views that reference missing files will fail on query, not creation
 -- To ensure smooth operation, run data simulation before querying views
@@ -26,51 +29,63 @@ CREATE SCHEMA IF NOT EXISTS events;
 
 -- add_to_cart: Tracks when users add items to their shopping cart
 CREATE OR REPLACE VIEW events.add_to_cart AS
-SELECT * FROM read_parquet(
-    'data/raw/add_to_cart/date=*/part-*.parquet',
+SELECT user_id, session_id, timestamp, cart_value, items_count, variant, date
+FROM read_parquet(
+    'data/raw/events/date=*/part-*.parquet',
     hive_partitioning = true,
     union_by_name = true
-);
+)
+WHERE event_type = 'add_to_cart';
 
 -- begin_checkout: Tracks when users initiate the checkout process
 CREATE OR REPLACE VIEW events.begin_checkout AS
-SELECT * FROM read_parquet(
-    'data/raw/begin_checkout/date=*/part-*.parquet',
+SELECT user_id, checkout_id, timestamp, variant, date
+FROM read_parquet(
+    'data/raw/events/date=*/part-*.parquet',
     hive_partitioning = true,
     union_by_name = true
-);
+)
+WHERE event_type = 'begin_checkout';
 
 -- checkout_step_view: Tracks each checkout step page view
 CREATE OR REPLACE VIEW events.checkout_step_view AS
-SELECT * FROM read_parquet(
-    'data/raw/checkout_step_view/date=*/part-*.parquet',
+SELECT checkout_id, step_name, step_index, timestamp, variant, latency_ms, date
+FROM read_parquet(
+    'data/raw/events/date=*/part-*.parquet',
     hive_partitioning = true,
     union_by_name = true
-);
+)
+WHERE event_type = 'checkout_step_view';
 
 -- form_error: Tracks form validation errors during checkout
 CREATE OR REPLACE VIEW events.form_error AS
-SELECT * FROM read_parquet(
-    'data/raw/form_error/date=*/part-*.parquet',
+SELECT checkout_id, step_name, field_name, error_code, timestamp, variant, date
+FROM read_parquet(
+    'data/raw/events/date=*/part-*.parquet',
     hive_partitioning = true,
     union_by_name = true
-);
+)
+WHERE event_type = 'form_error';
 
 -- payment_attempt: Tracks payment authorization attempts
 CREATE OR REPLACE VIEW events.payment_attempt AS
-SELECT * FROM read_parquet(
-    'data/raw/payment_attempt/date=*/part-*.parquet',
+SELECT checkout_id, payment_method, authorized, timestamp, variant, date
+FROM read_parquet(
+    'data/raw/events/date=*/part-*.parquet',
     hive_partitioning = true,
     union_by_name = true
-);
+)
+WHERE event_type = 'payment_attempt';
 
 -- order_completed: Tracks successfully completed orders
 CREATE OR REPLACE VIEW events.order_completed AS
-SELECT * FROM read_parquet(
-    'data/raw/order_completed/date=*/part-*.parquet',
+SELECT order_id, checkout_id, user_id, timestamp, order_value, currency, variant, date
+FROM read_parquet(
+    'data/raw/events/date=*/part-*.parquet',
     hive_partitioning = true,
     union_by_name = true
-);
+)
+WHERE event_type = 'order_completed';
 
 -- =====================================================================
 -- Schema Registration Complete
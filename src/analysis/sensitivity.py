@@ -43,6 +43,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Quoted raw events glob in sql/schema.sql, swapped for the sweep's data dir
+SCHEMA_EVENTS_GLOB = "'data/raw/events/date=*/part-*.parquet'"
+
 
 def parse_comma_separated_floats(value: str) -> List[float]:
     """Parse comma-separated float values."""
@@ -238,6 +241,17 @@ def run_simulation(
         return False
 
 
+def _strip_attach_use(sql: str) -> str:
+    """Remove ATTACH and USE statements since we're already connected."""
+    lines = []
+    for line in sql.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith("ATTACH") or stripped.startswith("USE"):
+            continue
+        lines.append(line)
+    return "\n".join(lines)
+
+
 def build_warehouse(data_dir: Path, db_path: Path) -> bool:
     """
     Build DuckDB warehouse from parquet files.
@@ -258,28 +272,19 @@ def build_warehouse(data_dir: Path, db_path: Path) -> bool:
         # Create events schema
         conn.execute("CREATE SCHEMA IF NOT EXISTS events")
 
-        # Register event views pointing to temp data directory
-        event_types = [
-            "add_to_cart",
-            "begin_checkout",
-            "checkout_step_view",
-            "form_error",
-            "payment_attempt",
-            "order_completed",
-        ]
-
-        for event_type in event_types:
-            event_path = data_dir / event_type / "date=*" / "part-*.parquet"
-            conn.execute(
-                f"""
-                CREATE OR REPLACE VIEW events.{event_type} AS
-                SELECT * FROM read_parquet(
-                    '{event_path}',
-                    hive_partitioning = true,
-                    union_by_name = true
-                )
-                """
+        # Register event views pointing to temp data directory: run
+        # sql/schema.sql with its raw events path swapped for data_dir
+        events_path = data_dir / "events" / "date=*" / "part-*.parquet"
+        schema_sql = _strip_attach_use(Path("sql/schema.sql").read_text())
+        # A miss would leave views on the real data/raw events, so fail the
+        # build if any quoted path to them survives the substitution
+        views_sql = schema_sql.replace(SCHEMA_EVENTS_GLOB, f"'{events_path}'")
+        if SCHEMA_EVENTS_GLOB not in schema_sql or "'data/raw/" in views_sql:
+            raise ValueError(
+                f"sql/schema.sql does not read its events via {SCHEMA_EVENTS_GLOB}; "
+                "cannot redirect its event views to the simulated data"
             )
+        conn.execute(views_sql)
 
         # Create marts schema
         conn.execute("CREATE SCHEMA IF NOT EXISTS marts")
@@ -292,15 +297,7 @@ def build_warehouse(data_dir: Path, db_path: Path) -> bool:
             "fct_orders.sql",
         ]:
             mart_sql = (marts_dir / mart_file).read_text()
-            # Remove ATTACH and USE statements since we're already connected
-            lines = []
-            for line in mart_sql.split("\n"):
-                stripped = line.strip()
-                if stripped.startswith("ATTACH") or stripped.startswith("USE"):
-                    continue
-                lines.append(line)
-            mart_sql = "\n".join(lines)
-            conn.execute(mart_sql)
+            conn.execute(_strip_attach_use(mart_sql))
 
         conn.close()
         return True
@@ -9,14 +9,18 @@ with A/B test variants and treatment uplift effects. Writes partitioned Parquet
 import argparse
 import hashlib
 import logging
-import random
+import os
 import sys
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Tuple
-from uuid import uuid4
+from typing import Callable, Dict, Iterator, List, Optional
 
+import numpy as np
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 
 # Configure logging
@@ -29,11 +33,25 @@ logger = logging.getLogger(__name__)
 
 
 # Schema validation: Valid enum values from tracking plan
+VALID_EVENT_TYPES = {
+    "add_to_cart",
+    "begin_checkout",
+    "checkout_step_view",
+    "form_error",
+    "payment_attempt",
+    "order_completed",
+}
 VALID_VARIANTS = {"control", "treatment"}
 VALID_STEP_NAMES = {"address", "shipping", "payment", "review"}
 VALID_PAYMENT_METHODS = {"card", "paypal"}
 VALID_ERROR_CODES = {"invalid", "declined", "timeout"}
 
+# Users simulated per worker shard. Fixed rather than derived from the CPU
+# or --workers count so that a given seed produces the same data on any
+# machine; the flip side is that days of up to SHARD_SIZE users (including
+# the default `make simulate` volume) run as a single in-process shard.
+SHARD_SIZE = 100_000
+
 # Funnel configuration
 CHECKOUT_STEPS = [("address", 0), ("shipping", 1), ("payment", 2), ("review", 3)]
 
@@ -45,11 +63,283 @@ STEP_FIELDS = {
     "review": ["terms_acceptance", "newsletter_opt_in"],
 }
 
+# Choices drawn by the funnel, as arrays with a fixed order so that draws are
+# reproducible (iteration order of a set of strings changes between processes)
+ERROR_CODES = np.array(["invalid", "declined", "timeout"])
+PAYMENT_METHODS = np.array(["card", "paypal"])
+STEP_NAMES = np.array([step_name for step_name, _ in CHECKOUT_STEPS])
+
+# The funnel constants must only produce tracking-plan enum values
+assert {step_name for step_name, _ in CHECKOUT_STEPS} == VALID_STEP_NAMES
+assert set(STEP_FIELDS) == VALID_STEP_NAMES
+assert set(ERROR_CODES) == VALID_ERROR_CODES
+assert set(PAYMENT_METHODS) == VALID_PAYMENT_METHODS
+
+# Per-step funnel constants indexed by step_index:
+# (base abandonment rate, step name, field names for form errors).
+# Abandonment rates decrease as the user progresses.
+STEP_TABLE = (
+    (0.20, "address", np.array(STEP_FIELDS["address"])),
+    (0.15, "shipping", np.array(STEP_FIELDS["shipping"])),
+    (0.10, "payment", np.array(STEP_FIELDS["payment"])),
+    (0.05, "review", np.array(STEP_FIELDS["review"])),
+)
+assert [step_name for _, step_name, _ in STEP_TABLE] == list(STEP_NAMES)
+
+# Base chance of a form error at each step (treatment lowers it with uplift)
+ERROR_RATE = 0.10
+
+# Allowed values of enum columns, enforced when Arrow tables are built
+COLUMN_ENUMS = {
+    "event_type": VALID_EVENT_TYPES,
+    "variant": VALID_VARIANTS,
+    "step_name": VALID_STEP_NAMES,
+    "payment_method": VALID_PAYMENT_METHODS,
+    "error_code": VALID_ERROR_CODES,
+}
+
+# Low-cardinality string columns are dictionary-encoded
+CATEGORY = pa.dictionary(pa.int8(), pa.string())
+
+# Event times are UTC wall-clock microseconds. The type is kept tz-naive so
+# DuckDB reads it as TIMESTAMP and DATE(timestamp) does not depend on the
+# session time zone.
+TIMESTAMP = pa.timestamp("us")
+
+MICROS_PER_HOUR = 3_600_000_000
+
+# ASCII lookup tables for vectorized hex formatting of random id bytes
+_HEX_LOWER = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+_HEX_UPPER = np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)
+
+# Character positions of hex digits in a canonical 36-character UUID string
+_UUID_HEX_POSITIONS = np.array([i for i in range(36) if i not in (8, 13, 18, 23)])
+
+# Columns of each event type, matching configs/tracking_plan.yml
+EVENT_SCHEMAS = {
+    "add_to_cart": pa.schema(
+        [
+            ("user_id", pa.string()),
+            ("session_id", pa.string()),
+            ("timestamp", TIMESTAMP),
+            ("cart_value", pa.float32()),
+            ("items_count", pa.int8()),
+            ("variant", CATEGORY),
+        ]
+    ),
+    "begin_checkout": pa.schema(
+        [
+            ("user_id", pa.string()),
+            ("checkout_id", pa.string()),
+            ("timestamp", TIMESTAMP),
+            ("variant", CATEGORY),
+        ]
+    ),
+    "checkout_step_view": pa.schema(
+        [
+            ("checkout_id", pa.string()),
+            ("step_name", CATEGORY),
+            ("step_index", pa.int8()),
+            ("timestamp", TIMESTAMP),
+            ("variant", CATEGORY),
+            ("latency_ms", pa.int16()),
+        ]
+    ),
+    "form_error": pa.schema(
+        [
+            ("checkout_id", pa.string()),
+            ("step_name", CATEGORY),
+            ("field_name", pa.string()),
+            ("error_code", CATEGORY),
+            ("timestamp", TIMESTAMP),
+            ("variant", CATEGORY),
+        ]
+    ),
+    "payment_attempt": pa.schema(
+        [
+            ("checkout_id", pa.string()),
+            ("payment_method", CATEGORY),
+            ("authorized", pa.bool_()),
+            ("timestamp", TIMESTAMP),
+            ("variant", CATEGORY),
+        ]
+    ),
+    "order_completed": pa.schema(
+        [
+            ("order_id", pa.string()),
+            ("checkout_id", pa.string()),
+            ("user_id", pa.string()),
+            ("timestamp", TIMESTAMP),
+            ("order_value", pa.float32()),
+            ("currency", CATEGORY),
+            ("variant", CATEGORY),
+        ]
+    ),
+}
+
+# All event types are written to one tall table: an event_type column plus
+# the union of the per-event columns, null where an event type lacks them.
+# Numbers use the narrowest type that holds their range: money is rounded to
+# cents below 500 (float32 keeps 7 significant digits), latency_ms is at
+# most 2000, items_count at most 10 and step_index at most 3.
+EVENTS_SCHEMA = pa.schema(
+    [
+        ("event_type", CATEGORY),
+        ("user_id", pa.string()),
+        ("session_id", pa.string()),
+        ("checkout_id", pa.string()),
+        ("timestamp", TIMESTAMP),
+        ("variant", CATEGORY),
+        ("step_name", CATEGORY),
+        ("step_index", pa.int8()),
+        ("latency_ms", pa.int16()),
+        ("field_name", pa.string()),
+        ("error_code", CATEGORY),
+        ("cart_value", pa.float32()),
+        ("items_count", pa.int8()),
+        ("payment_method", CATEGORY),
+        ("authorized", pa.bool_()),
+        ("order_id", pa.string()),
+        ("order_value", pa.float32()),
+        ("currency", CATEGORY),
+    ]
+)
+assert set(EVENT_SCHEMAS) == VALID_EVENT_TYPES
+assert all(
+    EVENTS_SCHEMA.field(field.name).type == field.type
+    for schema in EVENT_SCHEMAS.values()
+    for field in schema
+)
+
+# Parquet encoding of the events table. Only the low-cardinality enum columns
+# are dictionary-encoded; ids are unique per row and would overflow the
+# dictionary page anyway. Splitting floats into byte streams groups their
+# similar exponent bytes, which zstd compresses better than interleaved values.
+PARQUET_WRITE_OPTIONS = dict(
+    compression="zstd",
+    compression_level=3,
+    use_dictionary=[
+        field.name for field in EVENTS_SCHEMA if pa.types.is_dictionary(field.type)
+    ],
+    use_byte_stream_split=[
+        field.name for field in EVENTS_SCHEMA if pa.types.is_floating(field.type)
+    ],
+    data_page_size=1 << 20,
+    write_statistics=True,
+)
+
+# Column dtypes of the events the funnel emits once per step. Strings are sized
+# for the longest possible value so that no block is truncated on append.
+STEP_VIEW_DTYPES = {
+    "checkout_id": np.intp,
+    "step_name": STEP_NAMES.dtype,
+    "step_index": np.int8,
+    "timestamp": np.float64,
+    "variant": np.intp,
+    "latency_ms": np.int16,
+}
+FORM_ERROR_DTYPES = {
+    "checkout_id": np.intp,
+    "step_name": STEP_NAMES.dtype,
+    "field_name": np.concatenate([fields for _, _, fields in STEP_TABLE]).dtype,
+    "error_code": ERROR_CODES.dtype,
+    "timestamp": np.float64,
+    "variant": np.intp,
+}
+
+# SplitMix64 constants (Steele et al.); all arithmetic wraps modulo 2**64
+_SPLITMIX_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+_SPLITMIX_MUL1 = np.uint64(0xBF58476D1CE4E5B9)
+_SPLITMIX_MUL2 = np.uint64(0x94D049BB133111EB)
+_UINT64_MASK = (1 << 64) - 1
+
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    """
+    Applies the SplitMix64 finalizer element-wise to a uint64 array.
+
+    Args:
+        x: Array of uint64 values
+
+    Returns:
+        Array of mixed uint64 values
+    """
+    z = x + _SPLITMIX_GAMMA
+    z = (z ^ (z >> np.uint64(30))) * _SPLITMIX_MUL1
+    z = (z ^ (z >> np.uint64(27))) * _SPLITMIX_MUL2
+    return z ^ (z >> np.uint64(31))
+
+
+def _splitmix64_scalar(x: int) -> int:
+    """
+    Applies the SplitMix64 finalizer to a single value.
+
+    Same steps as _splitmix64 on a Python int masked to 64 bits, which is
+    cheaper than a one-element array when assigning one user at a time.
+
+    Args:
+        x: Integer in [0, 2**64)
+
+    Returns:
+        Mixed integer in [0, 2**64)
+    """
+    z = (x + int(_SPLITMIX_GAMMA)) & _UINT64_MASK
+    z = ((z ^ (z >> 30)) * int(_SPLITMIX_MUL1)) & _UINT64_MASK
+    z = ((z ^ (z >> 27)) * int(_SPLITMIX_MUL2)) & _UINT64_MASK
+    return z ^ (z >> 31)
+
+
+@lru_cache(maxsize=None)
+def _salt_key(date_str: str, salt: str) -> np.uint64:
+    """
+    Derives a stable 64-bit key for a (date, salt) pair.
+
+    Python's built-in hash() is randomized per process, so MD5 is used here.
+    The key is cached, so the hash input is encoded and hashed once per day
+    and salt even when assign_variant is called once per user.
+
+    Args:
+        date_str: Date string in YYYY-MM-DD format
+        salt: Salt string for hash consistency
+
+    Returns:
+        64-bit key as np.uint64
+    """
+    digest = hashlib.md5(f"{date_str}:{salt}".encode("utf-8")).digest()
+    # The first 8 digest bytes, read big-endian: the leading 16 hex digits
+    return np.uint64(int.from_bytes(digest[:8], "big"))
+
+
+def assign_variants_bulk(
+    date_str: str, n: int, salt: str = "experiment_v1", start: int = 0
+) -> np.ndarray:
+    """
+    Assigns users start..start+n-1 of a day to variants deterministically.
+
+    Hashes the integer user index (user_ids are ``user_{date}_{i:06d}``) with
+    SplitMix64 over a NumPy uint64 array instead of hashing each id string.
+
+    Args:
+        date_str: Date string in YYYY-MM-DD format
+        n: Number of users
+        salt: Salt string for hash consistency
+        start: Index of the first user
+
+    Returns:
+        Array of variant names ('control' or 'treatment'), one per user
+    """
+    idx = np.arange(start, start + n, dtype=np.uint64) + _salt_key(date_str, salt)
+    z = _splitmix64(idx)
+    return np.where(z & np.uint64(1), "treatment", "control")
+
 
 def assign_variant(user_id: str, salt: str = "experiment_v1") -> str:
     """
     Assigns a user to a variant deterministically using hash-based assignment.
 
+    Scalar counterpart of assign_variants_bulk; both give the same variant
+    for a given ``user_{date}_{i:06d}`` id.
+
     Args:
         user_id: Unique user identifier
         salt: Salt string for hash consistency
@@ -57,9 +347,9 @@ def assign_variant(user_id: str, salt: str = "experiment_v1") -> str:
     Returns:
         Variant name: 'control' or 'treatment'
     """
-    hash_input = f"{user_id}:{salt}".encode("utf-8")
-    hash_value = int(hashlib.md5(hash_input).hexdigest(), 16)
-    return "treatment" if hash_value % 2 == 0 else "control"
+    _, date_str, index = user_id.split("_")
+    idx = (int(index) + int(_salt_key(date_str, salt))) & _UINT64_MASK
+    return "treatment" if _splitmix64_scalar(idx) & 1 else "control"
 
 
 def validate_enum(value: str, valid_values: set, field_name: str) -> None:
@@ -80,250 +370,614 @@ def validate_enum(value: str, valid_values: set, field_name: str) -> None:
         )
 
 
-def generate_timestamp(base_date: datetime, hour_offset: float) -> str:
+def _hex_chars(raw: np.ndarray, digits: np.ndarray = _HEX_LOWER) -> np.ndarray:
     """
-    Generates an ISO 8601 timestamp.
+    Formats each row of a uint8 matrix as ASCII hex digits.
 
     Args:
-        base_date: Base date for the event
-        hour_offset: Hours to add to base date
+        raw: Array of shape (n, k) holding random bytes
+        digits: Lookup table of the 16 hex digit characters
 
     Returns:
-        ISO 8601 formatted timestamp string
+        uint8 array of shape (n, 2k) holding ASCII characters
     """
-    ts = base_date + timedelta(hours=hour_offset)
-    return ts.isoformat() + "Z"
+    chars = np.empty((raw.shape[0], raw.shape[1] * 2), dtype=np.uint8)
+    chars[:, 0::2] = digits[raw >> 4]
+    chars[:, 1::2] = digits[raw & 0x0F]
+    return chars
 
 
-def simulate_user_funnel(
-    user_id: str,
-    session_id: str,
-    variant: str,
-    base_date: datetime,
-    uplift: float,
-    rng: random.Random,
-) -> Tuple[List[Dict], List[Dict], List[Dict], List[Dict], List[Dict], List[Dict]]:
+def gen_uuid_strings(rng: np.random.Generator, n: int) -> np.ndarray:
     """
-    Simulates a complete checkout funnel for a single user.
+    Generates n random version-4 UUID strings in one batch.
+
+    Draws all 16n bytes with a single rng.bytes call and formats them with
+    array operations instead of building n uuid.UUID objects.
 
     Args:
-        user_id: User identifier
-        session_id: Session identifier
-        variant: Experiment variant (control or treatment)
-        base_date: Base date for events
-        uplift: Treatment uplift factor for conversion rates
-        rng: Random number generator
+        rng: NumPy random generator
+        n: Number of ids to generate
 
     Returns:
-        Tuple of event lists: (add_to_cart, begin_checkout, checkout_step_view,
-                               form_error, payment_attempt, order_completed)
+        Array of canonical 36-character UUID strings
     """
-    validate_enum(variant, VALID_VARIANTS, "variant")
+    raw = np.frombuffer(rng.bytes(n * 16), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40  # version 4
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80  # RFC 4122 variant
 
-    # Apply uplift multiplier for treatment
-    uplift_multiplier = (1.0 + uplift) if variant == "treatment" else 1.0
+    chars = np.full((n, 36), ord("-"), dtype=np.uint8)
+    chars[:, _UUID_HEX_POSITIONS] = _hex_chars(raw)
+    return chars.view("S36").ravel().astype("U36")
 
-    # For A/A tests (uplift=0), treatment should behave identically to control
-    # error_multiplier reduces errors for treatment when uplift > 0
-    error_multiplier = (1.0 - uplift * 0.4) if variant == "treatment" else 1.0
-    # abandon_multiplier reduces abandonment for treatment when uplift > 0
-    abandon_multiplier = (1.0 - uplift * 0.3) if variant == "treatment" else 1.0
 
-    # Event storage
-    add_to_cart_events = []
-    begin_checkout_events = []
-    checkout_step_view_events = []
-    form_error_events = []
-    payment_attempt_events = []
-    order_completed_events = []
+def gen_user_ids(date_str: str, start: int, end: int) -> np.ndarray:
+    """
+    Builds the ids ``user_{date}_{i:06d}`` of users start..end-1 of a day.
 
-    # Random hour within the day for user activity
-    hour_offset = rng.uniform(0, 24)
+    Args:
+        date_str: Date string in YYYY-MM-DD format
+        start: Index of the first user
+        end: Index one past the last user
 
-    # Step 1: add_to_cart event
-    cart_value = round(rng.uniform(20.0, 500.0), 2)
-    items_count = rng.randint(1, 10)
+    Returns:
+        Array of user id strings
+    """
+    indexes = np.char.zfill(np.arange(start, end).astype(str), 6)
+    return np.char.add(f"user_{date_str}_", indexes)
 
-    add_to_cart_events.append(
-        {
-            "user_id": user_id,
-            "session_id": session_id,
-            "timestamp": generate_timestamp(base_date, hour_offset),
-            "cart_value": cart_value,
-            "items_count": items_count,
-            "variant": variant,
-        }
-    )
 
-    # Step 2: Decide if user begins checkout (baseline ~65-70%)
-    cart_to_checkout_rate = 0.67 * uplift_multiplier
-    if rng.random() > cart_to_checkout_rate:
-        return (
-            add_to_cart_events,
-            begin_checkout_events,
-            checkout_step_view_events,
-            form_error_events,
-            payment_attempt_events,
-            order_completed_events,
-        )
+def gen_order_ids(rng: np.random.Generator, n: int) -> np.ndarray:
+    """
+    Generates n order ids of the form ORD-<12 uppercase hex digits>.
 
-    checkout_id = str(uuid4())
-    hour_offset += rng.uniform(0.01, 0.1)  # Small time increment
+    Args:
+        rng: NumPy random generator
+        n: Number of ids to generate
 
-    begin_checkout_events.append(
-        {
-            "user_id": user_id,
-            "checkout_id": checkout_id,
-            "timestamp": generate_timestamp(base_date, hour_offset),
-            "variant": variant,
-        }
-    )
+    Returns:
+        Array of order id strings
+    """
+    raw = np.frombuffer(rng.bytes(n * 6), dtype=np.uint8).reshape(n, 6)
+
+    chars = np.empty((n, 16), dtype=np.uint8)
+    chars[:, :4] = np.frombuffer(b"ORD-", dtype=np.uint8)
+    chars[:, 4:] = _hex_chars(raw, _HEX_UPPER)
+    return chars.view("S16").ravel().astype("U16")
+
+
+@dataclass
+class EventBuffer:
+    """
+    Columnar buffer for one event type: a preallocated NumPy array per column.
+
+    Blocks of rows are copied in at the cursor ``size``. The arrays are sized
+    from an estimate up front and grow geometrically if it is exceeded, so
+    appending never builds per-event objects or per-block lists.
+    """
+
+    columns: Dict[str, np.ndarray]
+    size: int = 0
 
-    # Step 3: Progress through checkout steps
-    for step_name, step_index in CHECKOUT_STEPS:
-        validate_enum(step_name, VALID_STEP_NAMES, "step_name")
-
-        hour_offset += rng.uniform(0.005, 0.02)  # Small time between steps
-        latency_ms = rng.randint(200, 2000)
-
-        checkout_step_view_events.append(
-            {
-                "checkout_id": checkout_id,
-                "step_name": step_name,
-                "step_index": step_index,
-                "timestamp": generate_timestamp(base_date, hour_offset),
-                "variant": variant,
-                "latency_ms": latency_ms,
-            }
+    @classmethod
+    def allocate(cls, dtypes: Dict[str, np.dtype], capacity: int) -> "EventBuffer":
+        """
+        Creates an empty buffer.
+
+        Args:
+            dtypes: Dictionary mapping column name to its NumPy dtype
+            capacity: Expected number of rows
+
+        Returns:
+            EventBuffer with room for capacity rows
+        """
+        return cls(
+            {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
         )
 
-        # Randomly generate form errors (5-15% chance per step, lower for treatment)
-        error_rate = 0.10 * error_multiplier
-        if rng.random() < error_rate:
-            error_code = rng.choice(list(VALID_ERROR_CODES))
-            validate_enum(error_code, VALID_ERROR_CODES, "error_code")
-
-            field_name = rng.choice(STEP_FIELDS.get(step_name, ["unknown_field"]))
-            hour_offset += rng.uniform(0.001, 0.005)
-
-            form_error_events.append(
-                {
-                    "checkout_id": checkout_id,
-                    "step_name": step_name,
-                    "field_name": field_name,
-                    "error_code": error_code,
-                    "timestamp": generate_timestamp(base_date, hour_offset),
-                    "variant": variant,
-                }
-            )
+    def append(self, num_rows: int, **block) -> None:
+        """
+        Appends a block of rows given as one value per column.
+
+        Args:
+            num_rows: Number of rows in the block
+            **block: Array of length num_rows, or a scalar repeated over the
+                block, for every buffer column
+        """
+        end = self.size + num_rows
+        for name, values in block.items():
+            column = self.columns[name]
+            if end > len(column):
+                column = np.resize(column, max(end, 2 * len(column)))
+                self.columns[name] = column
+            column[self.size : end] = values
+        self.size = end
+
+    def to_columns(self, sort_by: Optional[str] = None) -> Dict[str, np.ndarray]:
+        """
+        Returns the filled part of each column.
+
+        Args:
+            sort_by: Optional column to stable-sort the rows by
+
+        Returns:
+            Dictionary mapping column name to its array of length size
+        """
+        columns = {name: values[: self.size] for name, values in self.columns.items()}
+        if sort_by is not None:
+            order = np.argsort(columns[sort_by], kind="stable")
+            columns = {name: values[order] for name, values in columns.items()}
+        return columns
+
+
+def make_funnel(
+    uplift: float,
+) -> Callable[[np.ndarray, np.random.Generator], Dict[str, Dict[str, np.ndarray]]]:
+    """
+    Builds the funnel simulation for one treatment uplift.
+
+    The per-variant rates are fixed for a whole run, so they are computed once
+    here as two-element tables indexed by variant (0 control, 1 treatment)
+    instead of rescaling per-user multipliers for every batch.
+
+    Args:
+        uplift: Treatment uplift factor for conversion rates
+
+    Returns:
+        simulate_funnel_batch(is_treatment, rng) for this uplift
+    """
+    # Apply uplift multiplier for treatment. For A/A tests (uplift=0),
+    # treatment behaves identically to control.
+    uplift_multiplier = np.array([1.0, 1.0 + uplift])
+    # error_multiplier reduces errors for treatment when uplift > 0
+    error_multiplier = np.array([1.0, 1.0 - uplift * 0.4])
+    # abandon_multiplier reduces abandonment for treatment when uplift > 0
+    abandon_multiplier = np.array([1.0, 1.0 - uplift * 0.3])
+
+    cart_to_checkout_rates = 0.67 * uplift_multiplier
+    auth_rates = 0.92 * uplift_multiplier
+    error_rates = ERROR_RATE * error_multiplier
+    step_table = tuple(
+        (base_abandon * abandon_multiplier, step_name, fields)
+        for base_abandon, step_name, fields in STEP_TABLE
+    )
+
+    def simulate_funnel_batch(
+        is_treatment: np.ndarray, rng: np.random.Generator
+    ) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Simulates the checkout funnel for a batch of users at once.
+
+        This is the numeric core of the simulation: each funnel stage draws one
+        array of random numbers for all users still in the funnel instead of
+        looping over users in Python. Identifier columns hold integer positions
+        (user_id, session_id and variant index the batch's users; checkout_id
+        and order_id number the batch's checkouts and orders) and timestamp
+        holds hour offsets. format_event_columns turns them into final values.
+
+        Args:
+            is_treatment: Boolean array, True for users in the treatment variant
+            rng: NumPy random generator
+
+        Returns:
+            Dictionary mapping event name to a dictionary of column arrays
+        """
+        num_users = len(is_treatment)
+        variant_index = is_treatment.astype(np.intp)
+
+        users = np.arange(num_users)
+
+        # Random hour within the day for user activity
+        hour_offset = rng.uniform(0, 24, num_users)
+
+        # Step 1: add_to_cart event
+        cart_value = np.round(rng.uniform(20.0, 500.0, num_users), 2).astype(np.float32)
+        items_count = rng.integers(1, 11, num_users).astype(np.int8)
+
+        add_to_cart = {
+            "user_id": users,
+            "session_id": users,
+            "timestamp": hour_offset,
+            "cart_value": cart_value,
+            "items_count": items_count,
+            "variant": users,
+        }
 
-        # Step abandonment rates (decreasing as user progresses)
-        abandonment_rates = {
-            "address": 0.20,
-            "shipping": 0.15,
-            "payment": 0.10,
-            "review": 0.05,
+        # Step 2: Decide which users begin checkout (baseline ~65-70%)
+        cart_to_checkout_rate = cart_to_checkout_rates[variant_index]
+        checkout_user = users[rng.random(num_users) <= cart_to_checkout_rate]
+        num_checkouts = len(checkout_user)
+        checkouts = np.arange(num_checkouts)
+        checkout_variant = variant_index[checkout_user]
+
+        # Per-checkout clock, advanced as users move through the funnel
+        clock = hour_offset[checkout_user] + rng.uniform(0.01, 0.1, num_checkouts)
+
+        begin_checkout = {
+            "user_id": checkout_user,
+            "checkout_id": checkouts,
+            "timestamp": clock.copy(),
+            "variant": checkout_user,
         }
 
-        abandon_rate = abandonment_rates[step_name] * abandon_multiplier
-        if rng.random() < abandon_rate:
-            # User abandons at this step
-            return (
-                add_to_cart_events,
-                begin_checkout_events,
-                checkout_step_view_events,
-                form_error_events,
-                payment_attempt_events,
-                order_completed_events,
+        # Step 3: Progress through checkout steps. Every checkout views at most
+        # one row per step; form errors hit ~10% of step views.
+        step_views = EventBuffer.allocate(
+            STEP_VIEW_DTYPES, num_checkouts * len(STEP_TABLE)
+        )
+        form_errors = EventBuffer.allocate(FORM_ERROR_DTYPES, num_checkouts // 2)
+        active = checkouts
+        for step_index, (abandon_rates, step_name, fields) in enumerate(step_table):
+            num_active = len(active)
+            active_users = checkout_user[active]
+            active_variant = checkout_variant[active]
+            clock[active] += rng.uniform(0.005, 0.02, num_active)
+            step_views.append(
+                num_active,
+                checkout_id=active,
+                step_name=step_name,
+                step_index=step_index,
+                timestamp=clock[active],
+                variant=active_users,
+                latency_ms=rng.integers(200, 2001, num_active),
             )
 
-    # Step 4: Payment attempt
-    hour_offset += rng.uniform(0.01, 0.03)
-    payment_method = rng.choice(list(VALID_PAYMENT_METHODS))
-    validate_enum(payment_method, VALID_PAYMENT_METHODS, "payment_method")
+            # Randomly generate form errors (~10% chance per step, lower for
+            # treatment)
+            error_rate = error_rates[active_variant]
+            erring = active[rng.random(num_active) < error_rate]
+            num_errors = len(erring)
+            if num_errors:
+                clock[erring] += rng.uniform(0.001, 0.005, num_errors)
+                form_errors.append(
+                    num_errors,
+                    checkout_id=erring,
+                    step_name=step_name,
+                    field_name=fields[rng.integers(0, len(fields), num_errors)],
+                    error_code=ERROR_CODES[
+                        rng.integers(0, len(ERROR_CODES), num_errors)
+                    ],
+                    timestamp=clock[erring],
+                    variant=checkout_user[erring],
+                )
 
-    # Payment authorization rate (higher for treatment)
-    auth_rate = 0.92 * uplift_multiplier
-    authorized = rng.random() < auth_rate
+            abandon_rate = abandon_rates[active_variant]
+            active = active[rng.random(num_active) >= abandon_rate]
 
-    payment_attempt_events.append(
-        {
-            "checkout_id": checkout_id,
-            "payment_method": payment_method,
+        # Step 4: Payment attempt
+        num_payments = len(active)
+        clock[active] += rng.uniform(0.01, 0.03, num_payments)
+
+        # Payment authorization rate (higher for treatment)
+        auth_rate = auth_rates[checkout_variant[active]]
+        authorized = rng.random(num_payments) < auth_rate
+
+        payment_attempt = {
+            "checkout_id": active,
+            "payment_method": PAYMENT_METHODS[
+                rng.integers(0, len(PAYMENT_METHODS), num_payments)
+            ],
             "authorized": authorized,
-            "timestamp": generate_timestamp(base_date, hour_offset),
-            "variant": variant,
+            "timestamp": clock[active],
+            "variant": checkout_user[active],
         }
+
+        # Step 5: Order completed (only if payment authorized)
+        paid = active[authorized]
+        num_orders = len(paid)
+        clock[paid] += rng.uniform(0.001, 0.01, num_orders)
+
+        order_completed = {
+            "order_id": np.arange(num_orders),
+            "checkout_id": paid,
+            "user_id": checkout_user[paid],
+            "timestamp": clock[paid],
+            "order_value": cart_value[checkout_user[paid]],
+            "currency": np.full(num_orders, "USD"),
+            "variant": checkout_user[paid],
+        }
+
+        return {
+            "add_to_cart": add_to_cart,
+            "begin_checkout": begin_checkout,
+            # Keep each checkout's rows together, as a per-user loop would
+            "checkout_step_view": step_views.to_columns(sort_by="checkout_id"),
+            "form_error": form_errors.to_columns(sort_by="checkout_id"),
+            "payment_attempt": payment_attempt,
+            "order_completed": order_completed,
+        }
+
+    return simulate_funnel_batch
+
+
+def format_event_columns(
+    events: Dict[str, Dict[str, np.ndarray]],
+    user_ids: np.ndarray,
+    variants: np.ndarray,
+    base_date: datetime,
+    rng: np.random.Generator,
+) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Replaces the integer positions from simulate_funnel_batch with final values.
+
+    Generates session, checkout and order ids after the numeric simulation,
+    outside of the funnel logic. Hour offsets become datetime64[us] values
+    with one vectorized add, which Arrow takes as a TIMESTAMP column without
+    copying.
+
+    Args:
+        events: Output of simulate_funnel_batch
+        user_ids: User identifiers for the batch
+        variants: Variant name for each user in the batch
+        base_date: Base date for events
+        rng: NumPy random generator for session, checkout and order ids
+
+    Returns:
+        Dictionary mapping event name to a dictionary of column arrays
+    """
+    num_users = len(user_ids)
+    num_checkouts = len(events["begin_checkout"]["checkout_id"])
+    num_orders = len(events["order_completed"]["order_id"])
+
+    lookups = {
+        "user_id": user_ids,
+        "session_id": gen_uuid_strings(rng, num_users),
+        "checkout_id": gen_uuid_strings(rng, num_checkouts),
+        "order_id": gen_order_ids(rng, num_orders),
+        "variant": variants,
+    }
+
+    base_time = np.datetime64(base_date, "us")
+
+    formatted = {}
+    for event_name, columns in events.items():
+        formatted[event_name] = {}
+        for name, values in columns.items():
+            if name in lookups:
+                values = lookups[name][values]
+            elif name == "timestamp":
+                offsets = np.rint(values * MICROS_PER_HOUR).astype(np.int64)
+                values = base_time + offsets.astype("timedelta64[us]")
+            formatted[event_name][name] = values
+    return formatted
+
+
+def _to_arrow(values, arrow_type: pa.DataType, name: str) -> pa.Array:
+    """
+    Converts a column to an Arrow array of the given type.
+
+    Enum columns are dictionary-encoded against their fixed set of valid
+    values, so a value outside the tracking plan fails here.
+
+    Args:
+        values: Column values
+        arrow_type: Target Arrow type
+        name: Column name, used to look up its allowed enum values
+
+    Returns:
+        Arrow array of arrow_type
+
+    Raises:
+        ValueError: If an enum column contains a value outside its valid set
+    """
+    if not pa.types.is_dictionary(arrow_type):
+        return pa.array(values, type=arrow_type)
+
+    values = pa.array(values)
+    valid_values = COLUMN_ENUMS.get(name)
+    if valid_values is None:
+        return values.cast(arrow_type)
+
+    dictionary = pa.array(sorted(valid_values), type=arrow_type.value_type)
+    indices = pc.index_in(values, value_set=dictionary)
+    if indices.null_count:
+        invalid = values.filter(indices.is_null())[0].as_py()
+        validate_enum(invalid, valid_values, name)
+    return pa.DictionaryArray.from_arrays(
+        indices.cast(arrow_type.index_type), dictionary
     )
 
-    # Step 5: Order completed (only if payment authorized)
-    if authorized:
-        order_id = f"ORD-{uuid4().hex[:12].upper()}"
-        hour_offset += rng.uniform(0.001, 0.01)
-
-        order_completed_events.append(
-            {
-                "order_id": order_id,
-                "checkout_id": checkout_id,
-                "user_id": user_id,
-                "timestamp": generate_timestamp(base_date, hour_offset),
-                "order_value": cart_value,
-                "currency": "USD",
-                "variant": variant,
-            }
-        )
 
-    return (
-        add_to_cart_events,
-        begin_checkout_events,
-        checkout_step_view_events,
-        form_error_events,
-        payment_attempt_events,
-        order_completed_events,
+def to_record_batch(columns: Dict[str, np.ndarray], event_name: str) -> pa.RecordBatch:
+    """
+    Builds an Arrow record batch of one event type's rows for the events table.
+
+    Columns the event type does not have are filled with nulls.
+
+    Args:
+        columns: Dictionary mapping column name to its values
+        event_name: Name of the event type
+
+    Returns:
+        Record batch with the schema EVENTS_SCHEMA
+    """
+    num_rows = len(next(iter(columns.values())))
+    event_columns = dict(columns, event_type=np.full(num_rows, event_name))
+    return pa.RecordBatch.from_pydict(
+        {
+            field.name: (
+                _to_arrow(event_columns[field.name], field.type, field.name)
+                if field.name in event_columns
+                else pa.nulls(num_rows, field.type)
+            )
+            for field in EVENTS_SCHEMA
+        },
+        schema=EVENTS_SCHEMA,
     )
 
 
-def write_parquet_partition(
-    data: List[Dict], event_name: str, date_str: str, base_path: Path
+def _write_record_batches(
+    writer: pq.ParquetWriter, record_batches: List[pa.RecordBatch]
 ) -> None:
     """
-    Writes event data to a partitioned Parquet file.
+    Appends one batch of users' events to a part file, a row group per batch.
 
     Args:
-        data: List of event dictionaries
-        event_name: Name of the event type
+        writer: Open writer of the shard's part file
+        record_batches: Record batches to write, one per event type
+    """
+    for record_batch in record_batches:
+        writer.write_batch(record_batch)
+
+
+def write_events(
+    record_batches: Iterator[List[pa.RecordBatch]],
+    date_str: str,
+    base_path: Path,
+    shard_id: int,
+) -> None:
+    """
+    Streams record batches into one shard's part file of the events table.
+
+    Each shard of a day writes its own part file,
+    events/date=<date>/part-<shard_id>.parquet, with one row group per record
+    batch. Record batches hold a single event type, so readers filtering on
+    event_type skip the other row groups by their statistics.
+
+    Writes run on a background thread, overlapping with the simulation of the
+    next batch of users; Arrow releases the GIL while encoding and writing. At
+    most one batch of users is in flight, which keeps row groups in order.
+
+    Args:
+        record_batches: Record batches with the schema EVENTS_SCHEMA, as one
+            list per batch of users
         date_str: Date string in YYYY-MM-DD format
         base_path: Base path for data files
+        shard_id: Index of the shard that produces the rows
     """
-    if not data:
-        return
-
-    # Create partition directory
-    partition_dir = base_path / event_name / f"date={date_str}"
+    partition_dir = base_path / "events" / f"date={date_str}"
     partition_dir.mkdir(parents=True, exist_ok=True)
 
-    # Convert to PyArrow table with explicit schema
-    table = pa.Table.from_pylist(data)
+    output_file = partition_dir / f"part-{shard_id:04d}.parquet"
+    logger.debug(f"Writing {output_file}")
+
+    writer = pq.ParquetWriter(output_file, EVENTS_SCHEMA, **PARQUET_WRITE_OPTIONS)
+    with writer:
+        with ThreadPoolExecutor(max_workers=1) as write_executor:
+            pending: Optional[Future] = None
+            for batch in record_batches:
+                # Wait for the previous batch, surfacing any write error
+                if pending is not None:
+                    pending.result()
+                pending = write_executor.submit(_write_record_batches, writer, batch)
+            if pending is not None:
+                pending.result()
+
+
+def _simulate_record_batches(
+    user_start: int,
+    user_end: int,
+    date: datetime,
+    uplift: float,
+    rng: np.random.Generator,
+    event_counts: Dict[str, int],
+) -> Iterator[List[pa.RecordBatch]]:
+    """
+    Simulates users in batches and yields their events as record batches.
+
+    Users are processed in batches to bound the size of intermediate arrays,
+    so memory is bounded by the batch size rather than the shard size.
+
+    Args:
+        user_start: Index of the first user
+        user_end: Index one past the last user
+        date: Date to simulate
+        uplift: Treatment uplift factor
+        rng: NumPy random generator
+        event_counts: Event counts by event type, updated in place
+
+    Yields:
+        For each batch of users, one record batch per event type with the
+        schema EVENTS_SCHEMA. The record batches own fresh arrays, so the next
+        batch can be simulated while they are written.
+    """
+    date_str = date.strftime("%Y-%m-%d")
+    variants = assign_variants_bulk(date_str, user_end - user_start, start=user_start)
+
+    simulate_funnel_batch = make_funnel(uplift)
+
+    batch_size = 50_000
+    for batch_start in range(user_start, user_end, batch_size):
+        batch_end = min(batch_start + batch_size, user_end)
+        batch_variants = variants[batch_start - user_start : batch_end - user_start]
+
+        # Simulate funnel for this batch of users
+        events = simulate_funnel_batch(batch_variants == "treatment", rng)
+
+        user_ids = gen_user_ids(date_str, batch_start, batch_end)
+        events = format_event_columns(events, user_ids, batch_variants, date, rng)
+
+        record_batches = []
+        for event_name, columns in events.items():
+            if not columns:
+                continue
+            record_batch = to_record_batch(columns, event_name)
+            if record_batch.num_rows == 0:
+                continue
+            event_counts[event_name] += record_batch.num_rows
+            record_batches.append(record_batch)
+        yield record_batches
+
+
+def _simulate_shard(
+    shard_id: int,
+    user_start: int,
+    user_end: int,
+    date: datetime,
+    uplift: float,
+    base_path: Path,
+    rng: np.random.Generator,
+) -> Dict[str, int]:
+    """
+    Simulates one shard of a day's users and writes its part file.
+
+    Runs in a worker process. The shard has its own random stream, spawned
+    from the run's generator, so the output does not depend on which worker
+    runs it. Each batch of users is written as soon as it is simulated.
 
-    # Write Parquet file
-    output_file = partition_dir / "part-0001.parquet"
-    pq.write_table(table, output_file, compression="snappy")
+    Args:
+        shard_id: Index of the shard within the day
+        user_start: Index of the first user in the shard
+        user_end: Index one past the last user in the shard
+        date: Date to simulate
+        uplift: Treatment uplift factor
+        base_path: Base path for output files
+        rng: The shard's NumPy random generator
 
-    logger.debug(f"Wrote {len(data)} rows to {output_file}")
+    Returns:
+        Dictionary with event counts by event type
+    """
+    event_counts = {event_name: 0 for event_name in EVENT_SCHEMAS}
+    record_batches = _simulate_record_batches(
+        user_start, user_end, date, uplift, rng, event_counts
+    )
+    write_events(record_batches, date.strftime("%Y-%m-%d"), base_path, shard_id)
+    return event_counts
 
 
 def simulate_day(
-    date: datetime, num_users: int, uplift: float, base_path: Path, rng: random.Random
+    date: datetime,
+    num_users: int,
+    uplift: float,
+    base_path: Path,
+    rng: np.random.Generator,
+    workers: Optional[int] = None,
 ) -> Dict[str, int]:
     """
     Simulates checkout funnel events for a single day.
 
+    Users are split into shards of SHARD_SIZE that are simulated in parallel
+    worker processes, each writing its own part file of the events table.
+    A day with at most SHARD_SIZE users is a single shard simulated
+    in-process, so ``workers`` only has an effect above that volume.
+
     Args:
         date: Date to simulate
         num_users: Number of users to simulate
         uplift: Treatment uplift factor
         base_path: Base path for output files
-        rng: Random number generator
+        rng: NumPy random generator; one stream is spawned from it per shard
+        workers: Maximum number of worker processes (default: CPU count);
+            ignored when num_users <= SHARD_SIZE
 
     Returns:
         Dictionary with event counts by event type
@@ -331,51 +985,43 @@ def simulate_day(
     date_str = date.strftime("%Y-%m-%d")
     logger.info(f"Simulating {num_users} users for {date_str}")
 
-    # Aggregate events for the day
-    all_events = {
-        "add_to_cart": [],
-        "begin_checkout": [],
-        "checkout_step_view": [],
-        "form_error": [],
-        "payment_attempt": [],
-        "order_completed": [],
+    variants = assign_variants_bulk(date_str, num_users)
+    variant_counts = {
+        "control": int(np.count_nonzero(variants == "control")),
+        "treatment": int(np.count_nonzero(variants == "treatment")),
     }
 
-    variant_counts = {"control": 0, "treatment": 0}
-
-    # Process users in batches to manage memory
-    batch_size = 1000
-    for batch_start in range(0, num_users, batch_size):
-        batch_end = min(batch_start + batch_size, num_users)
-
-        for i in range(batch_start, batch_end):
-            user_id = f"user_{date_str}_{i:06d}"
-            session_id = str(uuid4())
-            variant = assign_variant(user_id)
-            variant_counts[variant] += 1
-
-            # Simulate funnel for this user
-            events = simulate_user_funnel(
-                user_id, session_id, variant, date, uplift, rng
-            )
-
-            # Unpack and collect events
-            (add_cart, begin_check, step_view, form_err, pay_attempt, order_comp) = (
-                events
-            )
-            all_events["add_to_cart"].extend(add_cart)
-            all_events["begin_checkout"].extend(begin_check)
-            all_events["checkout_step_view"].extend(step_view)
-            all_events["form_error"].extend(form_err)
-            all_events["payment_attempt"].extend(pay_attempt)
-            all_events["order_completed"].extend(order_comp)
-
-    # Write Parquet files for each event type
-    for event_name, events in all_events.items():
-        write_parquet_partition(events, event_name, date_str, base_path)
+    # Remove part files of a previous run so shards are not mixed across runs
+    for stale_file in (base_path / "events" / f"date={date_str}").glob(
+        "part-*.parquet"
+    ):
+        stale_file.unlink()
+
+    # One independent, reproducible random stream per shard
+    shard_starts = range(0, num_users, SHARD_SIZE)
+    shard_rngs = rng.spawn(len(shard_starts))
+    shard_args = [
+        (shard_id, start, min(start + SHARD_SIZE, num_users), date, uplift, base_path)
+        for shard_id, start in enumerate(shard_starts)
+    ]
+
+    if len(shard_args) == 1:
+        # Not worth starting worker processes for a single shard
+        shard_counts = [_simulate_shard(*shard_args[0], shard_rngs[0])]
+    else:
+        max_workers = min(workers or os.cpu_count() or 1, len(shard_args))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_simulate_shard, *args, shard_rng)
+                for args, shard_rng in zip(shard_args, shard_rngs)
+            ]
+            shard_counts = [future.result() for future in futures]
 
     # Log summary
-    event_counts = {k: len(v) for k, v in all_events.items()}
+    event_counts = {
+        event_name: sum(counts[event_name] for counts in shard_counts)
+        for event_name in EVENT_SCHEMAS
+    }
     logger.info(f"Day {date_str} summary:")
     logger.info(
         f"  Variants: control={variant_counts['control']}, "
@@ -434,6 +1080,16 @@ def main() -> int:
         action="store_true",
         help="Run A/A test (forces uplift to 0.0 for both variants)",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=(
+            "Maximum number of worker processes (default: CPU count). "
+            f"Days are split into shards of {SHARD_SIZE:,} users, so this "
+            f"only has an effect above {SHARD_SIZE:,} users/day"
+        ),
+    )
 
     args = parser.parse_args()
 
@@ -454,8 +1110,9 @@ def main() -> int:
             f"uplift={args.uplift:.2%}, seed={args.seed}"
         )
 
-        # Initialize random number generator
-        rng = random.Random(args.seed)
+        # Initialize random number generator. PCG64DXSM is NumPy's recommended
+        # bit generator for streams that are spawned for parallel workers.
+        rng = np.random.Generator(np.random.PCG64DXSM(args.seed))
 
         # Set up output path
         base_path = Path(args.output)
@@ -468,7 +1125,12 @@ def main() -> int:
 
             try:
                 day_counts = simulate_day(
-                    current_date, args.users, args.uplift, base_path, rng
+                    current_date,
+                    args.users,
+                    args.uplift,
+                    base_path,
+                    rng,
+                    workers=args.workers,
                 )
 
                 # Aggregate totals
@@ -6,27 +6,130 @@ Generates a compact markdown report with primary metric and guardrails
 for the most recent date.
 """
 
+import io
 import sys
 import json
-import duckdb
-import pandas as pd
 from datetime import datetime
+from functools import lru_cache
+from importlib.util import find_spec
 from pathlib import Path
 
+# duckdb, pandas and jinja2 are imported where they are first used, so runs
+# that skip a section (e.g. no sensitivity results) don't pay for the import
+JINJA_AVAILABLE = find_spec("jinja2") is not None
+
 try:
-    from jinja2 import Environment, FileSystemLoader
+    import orjson
 
-    JINJA_AVAILABLE = True
+    ORJSON_AVAILABLE = True
 except ImportError:
-    JINJA_AVAILABLE = False
+    ORJSON_AVAILABLE = False
+
+
+# Report queries. The date is bound as a parameter rather than interpolated,
+# so the SQL is built once and values never need quoting.
+_MOST_RECENT_DATE_SQL = "SELECT MAX(date) FROM events.add_to_cart"
+
+_METRICS_SQL = """
+    WITH adders AS (
+        SELECT 
+            variant,
+            COUNT(DISTINCT user_id) as adders
+        FROM events.add_to_cart
+        WHERE date = $date
+        GROUP BY variant
+    ),
+    orders AS (
+        SELECT 
+            variant,
+            COUNT(DISTINCT user_id) as orderers,
+            ROUND(AVG(order_value), 2) as avg_order_value
+        FROM events.order_completed
+        WHERE date = $date
+        GROUP BY variant
+    ),
+    payment_auth AS (
+        SELECT 
+            variant,
+            ROUND(SUM(CASE WHEN authorized THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 1) as auth_rate_pct
+        FROM events.payment_attempt
+        WHERE date = $date
+        GROUP BY variant
+    )
+    -- Cells are formatted here, ready for the markdown tables
+    SELECT 
+        a.variant,
+        format('{:,}', a.adders) as adders,
+        format('{:,}', COALESCE(o.orderers, 0)) as orders,
+        printf('%.1f%%', ROUND(COALESCE(o.orderers, 0) * 100.0 / a.adders, 1)) as conditional_conversion_pct,
+        printf('%.1f%%', p.auth_rate_pct) as auth_rate_pct,
+        printf('$%.2f', o.avg_order_value) as avg_order_value
+    FROM adders a
+    LEFT JOIN orders o ON a.variant = o.variant
+    LEFT JOIN payment_auth p ON a.variant = p.variant
+    ORDER BY a.variant
+"""
 
 
-def load_experiment_config():
+# Markdown table headers (header row and separator)
+_STATS_GUARDRAILS_HEADER = (
+    "| Metric | Control | Treatment |\n"
+    "|--------|---------|----------|\n"
+)
+
+_EXEC_GUARDRAILS_HEADER = (
+    "| Metric | Control | Treatment | Status |\n"
+    "|--------|---------|-----------|--------|\n"
+)
+
+_POWER_BY_UPLIFT_HEADER = (
+    "| Uplift | Best Power | Users/Day | Detections |\n"
+    "|--------|------------|-----------|------------|\n"
+)
+
+_PRIMARY_METRIC_HEADER = (
+    "| Variant | Adders | Orders | Conditional Conversion |\n"
+    "|---------|--------|--------|------------------------|\n"
+)
+
+_GUARDRAILS_HEADER = (
+    "| Variant | Payment Auth Rate | Avg Order Value |\n"
+    "|---------|-------------------|------------------|\n"
+)
+
+
+@lru_cache(maxsize=None)
+def _get_exec_template():
+    """Returns the compiled executive summary template."""
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+    # Persist compiled template bytecode so a fresh process skips parsing and
+    # compiling the template; Jinja recompiles when the source changes
+    cache_dir = Path(".cache/jinja")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(directory=str(cache_dir))
+    except OSError:
+        bytecode_cache = None
+
+    # Templates don't change during a run: keep every compiled template and
+    # skip the per-render check of the source file's mtime
+    env = Environment(
+        loader=FileSystemLoader("reports/templates"),
+        auto_reload=False,
+        cache_size=-1,
+        bytecode_cache=bytecode_cache,
+    )
+    return env.get_template("executive_summary.md.jinja")
+
+
+@lru_cache(maxsize=1)
+def _load_experiment_config_dict():
     """
-    Loads experiment configuration to get MDE.
+    Loads and parses configs/experiment.yml once per process.
 
     Returns:
-        MDE value or None if not available
+        Parsed config dictionary, or None if the file is missing or unreadable
     """
     try:
         import yaml
@@ -35,13 +138,79 @@ def load_experiment_config():
         if not config_path.exists():
             return None
 
+        # libyaml's C loader when PyYAML was built with it, same safe semantics
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
         with open(config_path, "r") as f:
-            config = yaml.safe_load(f)
-            return config.get("experiment", {}).get("mde_abs")
+            return yaml.load(f, Loader=loader)
     except Exception:
         return None
 
 
+def load_experiment_config():
+    """
+    Loads experiment configuration to get MDE.
+
+    Returns:
+        MDE value or None if not available
+    """
+    config = _load_experiment_config_dict()
+    if not config:
+        return None
+    return config.get("experiment", {}).get("mde_abs")
+
+
+# The result loaders are keyed on (path, mtime) so repeated report runs in one
+# process reuse parsed files until they are rewritten. Callers treat the
+# returned objects as read-only.
+@lru_cache(maxsize=16)
+def _load_json_cached(path, mtime_ns):
+    """
+    Parses a JSON file, with orjson when it is installed.
+
+    Args:
+        path: Path to the JSON file
+        mtime_ns: Modification time of the file, part of the cache key only
+
+    Returns:
+        Parsed JSON value
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # json.dump writes NaN/Infinity for non-finite floats, which
+            # orjson rejects; the stdlib parser accepts them
+            pass
+    return json.loads(data)
+
+
+def _load_json(path):
+    """Parses a JSON file, reusing the cached result while it is unchanged."""
+    return _load_json_cached(str(path), Path(path).stat().st_mtime_ns)
+
+
+@lru_cache(maxsize=16)
+def _read_csv_cached(path, mtime_ns):
+    """
+    Reads a CSV file into a DataFrame.
+
+    Args:
+        path: Path to the CSV file
+        mtime_ns: Modification time of the file, part of the cache key only
+
+    Returns:
+        DataFrame with the file's contents
+    """
+    import pandas as pd
+
+    # The summary holds one row per grid cell (a dozen for the presets);
+    # pandas' reader beats a DuckDB read_csv_auto round trip at this size
+    return pd.read_csv(path)
+
+
 def load_sensitivity_results():
     """
     Load sensitivity analysis results if they exist.
@@ -56,12 +225,11 @@ def load_sensitivity_results():
         return None, None
 
     try:
-        df = pd.read_csv(csv_path)
+        df = _read_csv_cached(str(csv_path), csv_path.stat().st_mtime_ns)
 
         metadata = None
         if meta_path.exists():
-            with open(meta_path, "r") as f:
-                metadata = json.load(f)
+            metadata = _load_json(meta_path)
 
         return df, metadata
 
@@ -84,11 +252,8 @@ def load_statistical_results():
         return None, None
 
     try:
-        with open(ccr_path, "r") as f:
-            ccr_summary = json.load(f)
-
-        with open(guardrails_path, "r") as f:
-            guardrails_summary = json.load(f)
+        ccr_summary = _load_json(ccr_path)
+        guardrails_summary = _load_json(guardrails_path)
 
         return ccr_summary, guardrails_summary
 
@@ -97,6 +262,109 @@ def load_statistical_results():
         return None, None
 
 
+def _build_exec_context(ccr_summary, guardrails_summary):
+    """
+    Build the executive summary template variables.
+
+    Args:
+        ccr_summary: CCR statistical results dictionary
+        guardrails_summary: Guardrails statistical results dictionary
+
+    Returns:
+        Dictionary of keyword arguments for the executive summary template
+    """
+    # Load experiment config for name
+    config = _load_experiment_config_dict()
+
+    experiment_name = (
+        config.get("experiment", {}).get("name", "Checkout Flow Optimization")
+        if config
+        else "Checkout Flow Optimization"
+    )
+
+    # Prepare template variables
+    effect_abs = ccr_summary["effect_abs"] * 100
+    ci_low = ccr_summary["ci_low"] * 100
+    ci_high = ccr_summary["ci_high"] * 100
+    p_value = ccr_summary["p_value"]
+    significant = ccr_summary["significant"]
+
+    # Get CCR values (already in decimal, convert to percentage)
+    ccr_control = ccr_summary["control"]["ccr"] * 100
+    ccr_treatment = ccr_summary["treatment"]["ccr"] * 100
+
+    # Calculate relative lift
+    lift_rel = (effect_abs / ccr_control * 100) if ccr_control > 0 else 0
+
+    # Create guardrails table
+    control_auth = guardrails_summary["payment_authorization"]["control"]
+    treatment_auth = guardrails_summary["payment_authorization"]["treatment"]
+    control_aov = guardrails_summary["average_order_value"]["control"]
+    treatment_aov = guardrails_summary["average_order_value"]["treatment"]
+
+    guardrails_table = _EXEC_GUARDRAILS_HEADER
+    guardrails_table += f"| Payment Auth Rate | {control_auth['rate']:.1%} | {treatment_auth['rate']:.1%} | Pass |\n"
+    guardrails_table += f"| Avg Order Value | ${control_aov['mean']:.2f} | ${treatment_aov['mean']:.2f} | Pass |"
+
+    # Determine decision
+    primary_result = (
+        "Statistically Significant"
+        if significant
+        else "Not Statistically Significant"
+    )
+    decision = (
+        "SHIP"
+        if significant and effect_abs > 0
+        else "DO NOT SHIP"
+        if significant and effect_abs < 0
+        else "INCONCLUSIVE"
+    )
+
+    if significant and effect_abs > 0:
+        ship_or_not = "Launch recommended - positive and significant lift observed"
+    elif significant and effect_abs < 0:
+        ship_or_not = "Do not launch - statistically significant negative effect"
+    else:
+        ship_or_not = (
+            "Insufficient evidence - consider extending experiment or iterating"
+        )
+
+    # Key diagnostics
+    key_diagnostics = (
+        f"- Effect size: {effect_abs:+.2f}pp ({lift_rel:+.1f}% relative)\n"
+    )
+    key_diagnostics += f"- 95% CI: [{ci_low:.2f}pp, {ci_high:.2f}pp]\n"
+    key_diagnostics += f"- All guardrails passed"
+
+    # Next steps
+    if significant and effect_abs > 0:
+        next_steps = "1. Prepare for launch\n2. Set up post-launch monitoring\n3. Document learnings"
+    elif significant and effect_abs < 0:
+        next_steps = (
+            "1. Do not launch\n2. Investigate root cause\n3. Design iteration"
+        )
+    else:
+        next_steps = "1. Review experiment design\n2. Consider extending duration\n3. Analyze segments for insights"
+
+    return {
+        "experiment_name": experiment_name,
+        "date_generated": datetime.now().strftime("%Y-%m-%d"),
+        "primary_result": primary_result,
+        "ccr_control": f"{ccr_control:.1f}",
+        "ccr_treatment": f"{ccr_treatment:.1f}",
+        "lift_abs": f"{effect_abs:+.2f}",
+        "lift_rel": f"{lift_rel:+.1f}",
+        "ci_low": f"{ci_low:.2f}",
+        "ci_high": f"{ci_high:.2f}",
+        "p_value": f"{p_value:.4f}",
+        "guardrails_table": guardrails_table,
+        "decision": decision,
+        "ship_or_not": ship_or_not,
+        "key_diagnostics_bullets": key_diagnostics,
+        "next_steps": next_steps,
+    }
+
+
 def generate_executive_summary_section(ccr_summary, guardrails_summary):
     """
     Generate an executive summary section using the Jinja template.
@@ -124,109 +392,9 @@ def generate_executive_summary_section(ccr_summary, guardrails_summary):
         return lines
 
     try:
-        # Load experiment config for name
-        config = None
-        try:
-            import yaml
-
-            config_path = Path("configs/experiment.yml")
-            if config_path.exists():
-                with open(config_path, "r") as f:
-                    config = yaml.safe_load(f)
-        except Exception:
-            pass
-
-        experiment_name = (
-            config.get("experiment", {}).get("name", "Checkout Flow Optimization")
-            if config
-            else "Checkout Flow Optimization"
-        )
-
-        # Prepare template variables
-        effect_abs = ccr_summary["effect_abs"] * 100
-        ci_low = ccr_summary["ci_low"] * 100
-        ci_high = ccr_summary["ci_high"] * 100
-        p_value = ccr_summary["p_value"]
-        significant = ccr_summary["significant"]
-
-        # Get CCR values (already in decimal, convert to percentage)
-        ccr_control = ccr_summary["control"]["ccr"] * 100
-        ccr_treatment = ccr_summary["treatment"]["ccr"] * 100
-
-        # Calculate relative lift
-        lift_rel = (effect_abs / ccr_control * 100) if ccr_control > 0 else 0
-
-        # Create guardrails table
-        control_auth = guardrails_summary["payment_authorization"]["control"]
-        treatment_auth = guardrails_summary["payment_authorization"]["treatment"]
-        control_aov = guardrails_summary["average_order_value"]["control"]
-        treatment_aov = guardrails_summary["average_order_value"]["treatment"]
-
-        guardrails_table = "| Metric | Control | Treatment | Status |\n"
-        guardrails_table += "|--------|---------|-----------|--------|\n"
-        guardrails_table += f"| Payment Auth Rate | {control_auth['rate']:.1%} | {treatment_auth['rate']:.1%} | Pass |\n"
-        guardrails_table += f"| Avg Order Value | ${control_aov['mean']:.2f} | ${treatment_aov['mean']:.2f} | Pass |"
-
-        # Determine decision
-        primary_result = (
-            "Statistically Significant"
-            if significant
-            else "Not Statistically Significant"
-        )
-        decision = (
-            "SHIP"
-            if significant and effect_abs > 0
-            else "DO NOT SHIP"
-            if significant and effect_abs < 0
-            else "INCONCLUSIVE"
-        )
-
-        if significant and effect_abs > 0:
-            ship_or_not = "Launch recommended - positive and significant lift observed"
-        elif significant and effect_abs < 0:
-            ship_or_not = "Do not launch - statistically significant negative effect"
-        else:
-            ship_or_not = (
-                "Insufficient evidence - consider extending experiment or iterating"
-            )
-
-        # Key diagnostics
-        key_diagnostics = (
-            f"- Effect size: {effect_abs:+.2f}pp ({lift_rel:+.1f}% relative)\n"
-        )
-        key_diagnostics += f"- 95% CI: [{ci_low:.2f}pp, {ci_high:.2f}pp]\n"
-        key_diagnostics += f"- All guardrails passed"
-
-        # Next steps
-        if significant and effect_abs > 0:
-            next_steps = "1. Prepare for launch\n2. Set up post-launch monitoring\n3. Document learnings"
-        elif significant and effect_abs < 0:
-            next_steps = (
-                "1. Do not launch\n2. Investigate root cause\n3. Design iteration"
-            )
-        else:
-            next_steps = "1. Review experiment design\n2. Consider extending duration\n3. Analyze segments for insights"
-
-        # Render template
-        env = Environment(loader=FileSystemLoader("reports/templates"))
-        template = env.get_template("executive_summary.md.jinja")
-
+        template = _get_exec_template()
         rendered = template.render(
-            experiment_name=experiment_name,
-            date_generated=datetime.now().strftime("%Y-%m-%d"),
-            primary_result=primary_result,
-            ccr_control=f"{ccr_control:.1f}",
-            ccr_treatment=f"{ccr_treatment:.1f}",
-            lift_abs=f"{effect_abs:+.2f}",
-            lift_rel=f"{lift_rel:+.1f}",
-            ci_low=f"{ci_low:.2f}",
-            ci_high=f"{ci_high:.2f}",
-            p_value=f"{p_value:.4f}",
-            guardrails_table=guardrails_table,
-            decision=decision,
-            ship_or_not=ship_or_not,
-            key_diagnostics_bullets=key_diagnostics,
-            next_steps=next_steps,
+            **_build_exec_context(ccr_summary, guardrails_summary)
         )
 
         lines.append(rendered)
@@ -249,74 +417,36 @@ def generate_compact_report():
             print("Run 'make build' to create the database.", file=sys.stderr)
             return 1
 
-        conn = duckdb.connect(str(db_path))
+        import duckdb
+
+        # Reports only read, so don't take the write lock; the events views
+        # read the same Parquet files in each query, so cache their metadata
+        conn = duckdb.connect(str(db_path), read_only=True)
+        conn.execute("SET parquet_metadata_cache = true")
 
         # Get most recent date
-        most_recent_date = conn.execute("""
-            SELECT MAX(date) FROM events.add_to_cart
-        """).fetchone()[0]
+        most_recent_date = conn.execute(_MOST_RECENT_DATE_SQL).fetchone()[0]
 
         if not most_recent_date:
             print("ERROR: No data found in events.add_to_cart", file=sys.stderr)
             conn.close()
             return 1
 
-        # Compute primary metric: adders, orders, conditional conversion
-        primary_metric = conn.execute(f"""
-            WITH adders AS (
-                SELECT 
-                    variant,
-                    COUNT(DISTINCT user_id) as adders
-                FROM events.add_to_cart
-                WHERE date = '{most_recent_date}'
-                GROUP BY variant
-            ),
-            orders AS (
-                SELECT 
-                    variant,
-                    COUNT(DISTINCT user_id) as orderers
-                FROM events.order_completed
-                WHERE date = '{most_recent_date}'
-                GROUP BY variant
-            )
-            SELECT 
-                a.variant,
-                a.adders,
-                COALESCE(o.orderers, 0) as orders,
-                ROUND(COALESCE(o.orderers, 0) * 100.0 / a.adders, 1) as conditional_conversion_pct
-            FROM adders a
-            LEFT JOIN orders o ON a.variant = o.variant
-            ORDER BY a.variant
-        """).fetchall()
-
-        # Compute guardrails: payment auth rate and avg order value
-        guardrails = conn.execute(f"""
-            WITH payment_auth AS (
-                SELECT 
-                    variant,
-                    COUNT(*) as total_attempts,
-                    SUM(CASE WHEN authorized THEN 1 ELSE 0 END) as authorized_attempts,
-                    ROUND(SUM(CASE WHEN authorized THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 1) as auth_rate_pct
-                FROM events.payment_attempt
-                WHERE date = '{most_recent_date}'
-                GROUP BY variant
-            ),
-            order_values AS (
-                SELECT 
-                    variant,
-                    ROUND(AVG(order_value), 2) as avg_order_value
-                FROM events.order_completed
-                WHERE date = '{most_recent_date}'
-                GROUP BY variant
-            )
-            SELECT 
-                p.variant,
-                p.auth_rate_pct,
-                o.avg_order_value
-            FROM payment_auth p
-            JOIN order_values o ON p.variant = o.variant
-            ORDER BY p.variant
-        """).fetchall()
+        # Compute the primary metric (adders, orders, conditional conversion)
+        # and the guardrails (payment auth rate, avg order value) per variant
+        # in one pass over the most recent date. The result is one row per
+        # variant, so plain tuples are cheaper than building a DataFrame.
+        metrics = conn.execute(
+            _METRICS_SQL, {"date": most_recent_date}
+        ).fetchall()
+
+        primary_metric = [row[:4] for row in metrics]
+        # Guardrails only cover variants with both payment attempts and orders
+        guardrails = [
+            (row[0], row[4], row[5])
+            for row in metrics
+            if row[4] is not None and row[5] is not None
+        ]
 
         conn.close()
 
@@ -324,18 +454,18 @@ def generate_compact_report():
         ccr_summary, guardrails_summary = load_statistical_results()
 
         # Build markdown report
-        lines = []
-        lines.append("# Checkout Flow Optimization Report\n\n")
-        lines.append(
+        buf = io.StringIO()
+        buf.write("# Checkout Flow Optimization Report\n\n")
+        buf.write(
             f"**Generated:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  \n"
         )
-        lines.append(f"**Date:** {most_recent_date}\n\n")
-        lines.append("---\n\n")
+        buf.write(f"**Date:** {most_recent_date}\n\n")
+        buf.write("---\n\n")
 
         # Statistical Results Section
         if ccr_summary and guardrails_summary:
-            lines.append("## Statistical Results\n\n")
-            lines.append(f"**Analysis Date:** {ccr_summary['date']}\n\n")
+            buf.write("## Statistical Results\n\n")
+            buf.write(f"**Analysis Date:** {ccr_summary['date']}\n\n")
 
             # CCR Lift with CI and p-value
             effect_abs = ccr_summary["effect_abs"] * 100  # Convert to percentage points
@@ -346,20 +476,19 @@ def generate_compact_report():
                 "Significant" if ccr_summary["significant"] else "Not significant"
             )
 
-            lines.append("**CCR Lift:**  \n")
-            lines.append(f"Effect: {effect_abs:+.2f}pp  \n")
-            lines.append(f"95% CI: [{ci_low:.2f}pp, {ci_high:.2f}pp]  \n")
-            lines.append(f"p-value: {p_value:.4f} ({significant})\n\n")
+            buf.write("**CCR Lift:**  \n")
+            buf.write(f"Effect: {effect_abs:+.2f}pp  \n")
+            buf.write(f"95% CI: [{ci_low:.2f}pp, {ci_high:.2f}pp]  \n")
+            buf.write(f"p-value: {p_value:.4f} ({significant})\n\n")
 
             # Guardrails Table with CIs
-            lines.append("**Guardrails:**\n\n")
-            lines.append("| Metric | Control | Treatment |\n")
-            lines.append("|--------|---------|----------|\n")
+            buf.write("**Guardrails:**\n\n")
+            buf.write(_STATS_GUARDRAILS_HEADER)
 
             # Payment Authorization Rate
             control_auth = guardrails_summary["payment_authorization"]["control"]
             treatment_auth = guardrails_summary["payment_authorization"]["treatment"]
-            lines.append(
+            buf.write(
                 f"| Payment Auth Rate | {control_auth['rate']:.1%} "
                 f"(95% CI: [{control_auth['ci_low']:.1%}, {control_auth['ci_high']:.1%}]) | "
                 f"{treatment_auth['rate']:.1%} "
@@ -369,56 +498,57 @@ def generate_compact_report():
             # Average Order Value
             control_aov = guardrails_summary["average_order_value"]["control"]
             treatment_aov = guardrails_summary["average_order_value"]["treatment"]
-            lines.append(
+            buf.write(
                 f"| Avg Order Value | ${control_aov['mean']:.2f} "
                 f"(n={control_aov['count']:,}) | "
                 f"${treatment_aov['mean']:.2f} "
                 f"(n={treatment_aov['count']:,}) |\n"
             )
 
-            lines.append("\n---\n\n")
+            buf.write("\n---\n\n")
 
         else:
             # Friendly note if results are missing
-            lines.append("## Statistical Results\n\n")
-            lines.append(
+            buf.write("## Statistical Results\n\n")
+            buf.write(
                 "> **Note:** Statistical test results have not been generated yet.  \n"
             )
-            lines.append(
+            buf.write(
                 "> Run `make results` to generate detailed statistical analysis including "
                 "effect sizes, confidence intervals, and p-values.\n\n"
             )
-            lines.append("---\n\n")
+            buf.write("---\n\n")
 
         # Sensitivity Summary Section
         sensitivity_df, sensitivity_meta = load_sensitivity_results()
         mde = load_experiment_config()
 
         if sensitivity_df is not None:
-            lines.append("## Sensitivity Analysis\n\n")
+            buf.write("## Sensitivity Analysis\n\n")
 
             if sensitivity_meta:
                 grid_size = sensitivity_meta.get("grid_specification", {}).get(
                     "grid_size", "N/A"
                 )
                 total_sims = sensitivity_meta.get("total_simulations", "N/A")
-                lines.append(f"**Grid Size:** {grid_size} parameter combinations  \n")
-                lines.append(f"**Total Simulations:** {total_sims:,}  \n\n")
+                buf.write(f"**Grid Size:** {grid_size} parameter combinations  \n")
+                buf.write(f"**Total Simulations:** {total_sims:,}  \n\n")
 
             # Find best detection rate near MDE
             if mde is not None:
-                # Filter to uplifts near the MDE (within 0.5pp)
-                near_mde = sensitivity_df[
-                    (sensitivity_df["uplift"] > 0)
-                    & (abs(sensitivity_df["uplift"] - mde) <= 0.005)
-                ].copy()
+                # Filter to uplifts near the MDE (within 0.5pp), building the
+                # mask on the raw array rather than through intermediate Series
+                uplifts = sensitivity_df["uplift"].to_numpy()
+                near_mde = sensitivity_df.iloc[
+                    (uplifts > 0) & (abs(uplifts - mde) <= 0.005)
+                ]
 
                 if not near_mde.empty:
                     best = near_mde.loc[near_mde["detection_rate"].idxmax()]
-                    lines.append(
+                    buf.write(
                         f"**Detection Rate near MDE ({mde * 100:.1f}pp):**  \n"
                     )
-                    lines.append(
+                    buf.write(
                         f"- {best['detection_rate']:.1%} power with {int(best['users_per_day']):,} users/day "
                         f"at {best['uplift'] * 100:.1f}pp uplift "
                         f"({int(best['detections'])}/{int(best['repeats'])} detections)\n\n"
@@ -427,12 +557,14 @@ def generate_compact_report():
                     # Show closest uplift tested
                     positive_uplifts = sensitivity_df[sensitivity_df["uplift"] > 0]
                     if not positive_uplifts.empty:
-                        closest_idx = (positive_uplifts["uplift"] - mde).abs().idxmin()
-                        closest = positive_uplifts.loc[closest_idx]
-                        lines.append(
+                        closest_pos = abs(
+                            positive_uplifts["uplift"].to_numpy() - mde
+                        ).argmin()
+                        closest = positive_uplifts.iloc[closest_pos]
+                        buf.write(
                             f"**Detection Rate near MDE ({mde * 100:.1f}pp):**  \n"
                         )
-                        lines.append(
+                        buf.write(
                             f"- Closest tested: {closest['detection_rate']:.1%} power with "
                             f"{int(closest['users_per_day']):,} users/day at {closest['uplift'] * 100:.1f}pp uplift "
                             f"({int(closest['detections'])}/{int(closest['repeats'])} detections)\n\n"
@@ -441,68 +573,77 @@ def generate_compact_report():
             # Summary table of best detection rates
             positive_results = sensitivity_df[sensitivity_df["uplift"] > 0].copy()
             if not positive_results.empty:
-                # Group by uplift and find max detection rate
+                # Best detection rate per uplift: a stable descending sort keeps
+                # the first row among ties, matching idxmax within each group
                 best_by_uplift = (
-                    positive_results.groupby("uplift")
-                    .apply(lambda x: x.loc[x["detection_rate"].idxmax()])
+                    positive_results.sort_values(
+                        "detection_rate", ascending=False, kind="stable"
+                    )
+                    .drop_duplicates("uplift", keep="first")
+                    .sort_values("uplift")
                     .reset_index(drop=True)
                 )
 
-                lines.append("**Power by Uplift:**\n\n")
-                lines.append("| Uplift | Best Power | Users/Day | Detections |\n")
-                lines.append("|--------|------------|-----------|------------|\n")
+                buf.write("**Power by Uplift:**\n\n")
+                buf.write(_POWER_BY_UPLIFT_HEADER)
 
-                for _, row in best_by_uplift.iterrows():
-                    lines.append(
-                        f"| {row['uplift'] * 100:.1f}pp | {row['detection_rate']:.1%} | "
-                        f"{int(row['users_per_day']):,} | {int(row['detections'])}/{int(row['repeats'])} |\n"
+                buf.write(
+                    "".join(
+                        f"| {row.uplift * 100:.1f}pp | {row.detection_rate:.1%} | "
+                        f"{int(row.users_per_day):,} | {int(row.detections)}/{int(row.repeats)} |\n"
+                        for row in best_by_uplift.itertuples(index=False)
                     )
+                )
 
-            lines.append("\n---\n\n")
+            buf.write("\n---\n\n")
 
         else:
             # Sensitivity data not available
-            lines.append("## Sensitivity Analysis\n\n")
-            lines.append("> **Note:** Sensitivity analysis has not been run yet.  \n")
-            lines.append(
+            buf.write("## Sensitivity Analysis\n\n")
+            buf.write("> **Note:** Sensitivity analysis has not been run yet.  \n")
+            buf.write(
                 "> Run `make sensitivity` or use the `quick_smoke` preset to generate power analysis:  \n"
             )
-            lines.append(
+            buf.write(
                 "> ```bash\n"
                 "> python src/analysis/sensitivity.py --preset quick_smoke --start 2025-02-01\n"
                 "> ```\n\n"
             )
-            lines.append("---\n\n")
+            buf.write("---\n\n")
 
         # Primary Metric Table
-        lines.append("## Primary Metric: Conditional Conversion Rate\n\n")
-        lines.append("| Variant | Adders | Orders | Conditional Conversion |\n")
-        lines.append("|---------|--------|--------|------------------------|\n")
-        for row in primary_metric:
-            variant, adders, orders, ccr = row
-            lines.append(f"| {variant} | {adders:,} | {orders:,} | {ccr}% |\n")
+        buf.write("## Primary Metric: Conditional Conversion Rate\n\n")
+        buf.write(_PRIMARY_METRIC_HEADER)
+        buf.write(
+            "".join(
+                f"| {variant} | {adders} | {orders} | {ccr} |\n"
+                for variant, adders, orders, ccr in primary_metric
+            )
+        )
 
         # Guardrails Table
-        lines.append("\n## Guardrails\n\n")
-        lines.append("| Variant | Payment Auth Rate | Avg Order Value |\n")
-        lines.append("|---------|-------------------|------------------|\n")
-        for row in guardrails:
-            variant, auth_rate, avg_value = row
-            lines.append(f"| {variant} | {auth_rate}% | ${avg_value:.2f} |\n")
+        buf.write("\n## Guardrails\n\n")
+        buf.write(_GUARDRAILS_HEADER)
+        buf.write(
+            "".join(
+                f"| {variant} | {auth_rate} | {avg_value} |\n"
+                for variant, auth_rate, avg_value in guardrails
+            )
+        )
 
         # Executive Summary Section
-        lines.append("\n---\n\n")
+        buf.write("\n---\n\n")
         executive_summary_lines = generate_executive_summary_section(
             ccr_summary, guardrails_summary
         )
-        lines.extend(executive_summary_lines)
+        buf.writelines(executive_summary_lines)
 
         # Write report
         output_path = Path("reports/REPORT.md")
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         with open(output_path, "w") as f:
-            f.writelines(lines)
+            f.write(buf.getvalue())
 
         # Print output path
         print(f"{output_path.resolve()}")
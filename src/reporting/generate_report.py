@@ -9,12 +9,96 @@ import duckdb
 from datetime import datetime
 from pathlib import Path
 
+# Report queries, built once at import. Table cells are formatted in SQL.
+_FUNNEL_SQL = """
+    WITH adders AS (
+        SELECT variant, COUNT(DISTINCT user_id) as adders
+        FROM marts.fct_experiments
+        GROUP BY variant
+    ),
+    orders AS (
+        SELECT variant, COUNT(DISTINCT user_id) as orderers
+        FROM marts.fct_orders
+        GROUP BY variant
+    )
+    SELECT 
+        a.variant, 
+        format('{:,}', a.adders) as adders, 
+        format('{:,}', COALESCE(o.orderers, 0)) as orderers,
+        printf('%.1f%%', ROUND(COALESCE(o.orderers, 0) * 100.0 / a.adders, 1)) as conv_rate
+    FROM adders a
+    LEFT JOIN orders o ON a.variant = o.variant
+    ORDER BY a.variant
+"""
+
+_STEPS_SQL = """
+    SELECT 
+        step_name, 
+        format('{:,}', COUNT(DISTINCT checkout_id)) as checkouts,
+        printf('%.0f', ROUND(AVG(median_latency_ms), 0)) as avg_latency
+    FROM marts.fct_checkout_steps
+    GROUP BY step_name, step_index
+    ORDER BY step_index
+"""
+
+_GUARDRAILS_SQL = """
+    WITH most_recent_date AS (
+        SELECT MAX(date) as max_date FROM events.add_to_cart
+    ),
+    payment_auth AS (
+        SELECT 
+            variant,
+            COUNT(*) as total_attempts,
+            ROUND(SUM(CASE WHEN authorized THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 1) as auth_rate_pct
+        FROM events.payment_attempt, most_recent_date
+        WHERE date = most_recent_date.max_date
+        GROUP BY variant
+    ),
+    order_values AS (
+        SELECT 
+            variant,
+            ROUND(AVG(order_value), 2) as avg_order_value
+        FROM events.order_completed, most_recent_date
+        WHERE date = most_recent_date.max_date
+        GROUP BY variant
+    )
+    SELECT 
+        p.variant,
+        printf('%.1f%%', p.auth_rate_pct) as auth_rate_pct,
+        printf('$%.2f', o.avg_order_value) as avg_order_value
+    FROM payment_auth p
+    JOIN order_values o ON p.variant = o.variant
+    ORDER BY p.variant
+"""
+
+
+# Markdown table headers (header row and separator)
+_FUNNEL_HEADER = (
+    "| Variant | Adders | Orders | Conversion Rate |\n"
+    "|---------|--------|--------|-----------------|\n"
+)
+
+_STEPS_HEADER = (
+    "| Step | Checkouts | Avg Latency (ms) |\n"
+    "|------|-----------|------------------|\n"
+)
+
+_GUARDRAILS_HEADER = (
+    "| Variant | Payment Auth Rate | Avg Order Value |\n"
+    "|---------|-------------------|------------------|\n"
+)
+
 
 def generate_report(output_path: str = "reports/metrics_summary.md"):
     """Generate markdown report with funnel metrics."""
 
-    # Connect to warehouse
-    conn = duckdb.connect("duckdb/warehouse.duckdb")
+    # Connect to warehouse. Every query below returns one row per variant or
+    # step, so results are fetched as tuples rather than DataFrames, whose
+    # construction costs more than the rows themselves at this size.
+    # Read-only, so concurrent report jobs don't contend for the write lock;
+    # cache Parquet metadata across the queries over the events views
+    conn = duckdb.connect("duckdb/warehouse.duckdb", read_only=True)
+    conn.execute("SET parquet_metadata_cache = true")
 
     # Start building report
     lines = []
@@ -24,85 +108,33 @@ def generate_report(output_path: str = "reports/metrics_summary.md"):
 
     # Overall Funnel
     lines.append("## Overall Funnel\n")
-    funnel = conn.execute("""
-        WITH adders AS (
-            SELECT variant, COUNT(DISTINCT user_id) as adders
-            FROM marts.fct_experiments
-            GROUP BY variant
-        ),
-        orders AS (
-            SELECT variant, COUNT(DISTINCT user_id) as orderers
-            FROM marts.fct_orders
-            GROUP BY variant
-        )
-        SELECT 
-            a.variant, 
-            a.adders, 
-            COALESCE(o.orderers, 0) as orderers,
-            ROUND(COALESCE(o.orderers, 0) * 100.0 / a.adders, 1) as conv_rate
-        FROM adders a
-        LEFT JOIN orders o ON a.variant = o.variant
-        ORDER BY a.variant
-    """).fetchall()
-
-    lines.append("| Variant | Adders | Orders | Conversion Rate |\n")
-    lines.append("|---------|--------|--------|-----------------|\n")
-    for row in funnel:
-        lines.append(f"| {row[0]} | {row[1]:,} | {row[2]:,} | {row[3]}% |\n")
+    funnel = conn.execute(_FUNNEL_SQL).fetchall()
+
+    lines.append(_FUNNEL_HEADER)
+    lines.extend(
+        f"| {variant} | {adders} | {orderers} | {conv_rate} |\n"
+        for variant, adders, orderers, conv_rate in funnel
+    )
 
     # Step Progression
     lines.append("\n## Step Progression\n")
-    steps = conn.execute("""
-        SELECT 
-            step_name, 
-            COUNT(DISTINCT checkout_id) as checkouts,
-            ROUND(AVG(median_latency_ms), 0) as avg_latency
-        FROM marts.fct_checkout_steps
-        GROUP BY step_name, step_index
-        ORDER BY step_index
-    """).fetchall()
-
-    lines.append("| Step | Checkouts | Avg Latency (ms) |\n")
-    lines.append("|------|-----------|------------------|\n")
-    for row in steps:
-        lines.append(f"| {row[0]} | {row[1]:,} | {row[2]:.0f} |\n")
+    steps = conn.execute(_STEPS_SQL).fetchall()
+
+    lines.append(_STEPS_HEADER)
+    lines.extend(
+        f"| {step_name} | {checkouts} | {avg_latency} |\n"
+        for step_name, checkouts, avg_latency in steps
+    )
 
     # Guardrail Metrics
     lines.append("\n## Guardrail Metrics (Most Recent Date)\n")
-    guardrails = conn.execute("""
-        WITH most_recent_date AS (
-            SELECT MAX(date) as max_date FROM events.add_to_cart
-        ),
-        payment_auth AS (
-            SELECT 
-                variant,
-                COUNT(*) as total_attempts,
-                ROUND(SUM(CASE WHEN authorized THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 1) as auth_rate_pct
-            FROM events.payment_attempt, most_recent_date
-            WHERE date = most_recent_date.max_date
-            GROUP BY variant
-        ),
-        order_values AS (
-            SELECT 
-                variant,
-                ROUND(AVG(order_value), 2) as avg_order_value
-            FROM events.order_completed, most_recent_date
-            WHERE date = most_recent_date.max_date
-            GROUP BY variant
-        )
-        SELECT 
-            p.variant,
-            p.auth_rate_pct,
-            o.avg_order_value
-        FROM payment_auth p
-        JOIN order_values o ON p.variant = o.variant
-        ORDER BY p.variant
-    """).fetchall()
-
-    lines.append("| Variant | Payment Auth Rate | Avg Order Value |\n")
-    lines.append("|---------|-------------------|------------------|\n")
-    for row in guardrails:
-        lines.append(f"| {row[0]} | {row[1]}% | ${row[2]:.2f} |\n")
+    guardrails = conn.execute(_GUARDRAILS_SQL).fetchall()
+
+    lines.append(_GUARDRAILS_HEADER)
+    lines.extend(
+        f"| {variant} | {auth_rate} | {avg_value} |\n"
+        for variant, auth_rate, avg_value in guardrails
+    )
 
     conn.close()
 
@@ -110,8 +142,9 @@ def generate_report(output_path: str = "reports/metrics_summary.md"):
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
+    # Join once and hand the writer a single string rather than a write per line
     with open(output_path, "w") as f:
-        f.writelines(lines)
+        f.write("".join(lines))
 
     return str(output_path.resolve())
 
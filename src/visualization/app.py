@@ -9,6 +9,31 @@ import streamlit as st
 import duckdb
 from pathlib import Path
 
+
+@st.cache_data(ttl=60)
+def load_warehouse_stats(path: str):
+    """
+    Counts users and variants in fct_experiments, cached for a minute.
+
+    Args:
+        path: Path to the DuckDB database file
+
+    Returns:
+        Tuple of (users, variants)
+    """
+    # Open the warehouse only for this query: a handle held across reruns
+    # would keep the file locked against `make build` / `make marts`
+    conn = duckdb.connect(path, read_only=True)
+    try:
+        return conn.execute("""
+            SELECT COUNT(DISTINCT user_id) as users,
+                   COUNT(DISTINCT variant) as variants
+            FROM marts.fct_experiments
+        """).fetchone()
+    finally:
+        conn.close()
+
+
 # Page configuration
 st.set_page_config(page_title="Checkout Flow Optimization", layout="wide")
 
@@ -47,16 +72,8 @@ st.markdown("### Database Connection")
 try:
     db_path = Path("duckdb/warehouse.duckdb")
     if db_path.exists():
-        conn = duckdb.connect(str(db_path))
-
         # Get basic stats
-        result = conn.execute("""
-            SELECT COUNT(DISTINCT user_id) as users,
-                   COUNT(DISTINCT variant) as variants
-            FROM marts.fct_experiments
-        """).fetchone()
-
-        conn.close()
+        result = load_warehouse_stats(str(db_path))
 
         st.success(
             f"Connected to warehouse! Users: {result[0]:,}, Variants: {result[1]}"